@@ -73,6 +73,12 @@ def main():
         "--project",
         help="GCP Project ID (optional, defaults to environment)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of journals downloaded and decoded in parallel (default: 1)"
+    )
 
     parser.add_argument(
         "-v", "--verbose", 
@@ -81,6 +87,8 @@ def main():
     )
 
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
     configure_logging(args.verbose)
     logger = logging.getLogger("export_logs")
 
@@ -116,7 +124,8 @@ def main():
             prefix=source_prefix,
             output_format="jsonl",
             output_bucket=dest_bucket,
-            output_prefix=args.output_prefix
+            output_prefix=args.output_prefix,
+            concurrency=args.concurrency
         )
         
         end_time = time.time()
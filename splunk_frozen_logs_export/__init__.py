@@ -1,14 +1,14 @@
 """SplunkFrozenLogsExport - Tool for exporting frozen Splunk logs from GCS."""
 
 from .journal import JournalDecoder
-from .event import Event
+from .event import Event, EventBatch
 
 # GCS integration (optional, requires google-cloud-storage)
 try:
     from .gcs import GCSJournalReader, list_buckets_in_gcs
     from .bigquery import BigQueryStreamer
-    __all__ = ['JournalDecoder', 'Event', 'GCSJournalReader', 'list_buckets_in_gcs', 'BigQueryStreamer']
+    __all__ = ['JournalDecoder', 'Event', 'EventBatch', 'GCSJournalReader', 'list_buckets_in_gcs', 'BigQueryStreamer']
 except ImportError:
-    __all__ = ['JournalDecoder', 'Event']
+    __all__ = ['JournalDecoder', 'Event', 'EventBatch']
 
 __version__ = "0.1.0"
@@ -3,20 +3,39 @@ Specialized decoders for different Splunk journal opcodes.
 """
 
 import struct
+import sys
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from . import varint
-from .metadata import read_metadata
-from .event import HASH_SIZE
+from .metadata import read_metadata_entries
+from .opcode import Opcode
+from .event import HASH_SIZE, _ZERO_HASH
+from .reader import RING_SIZE
 
 if TYPE_CHECKING:
-    from .journal import JournalDecoder
+    from .journal import DecoderState, JournalDecoder
     from .reader import CountedReader
 
 
 logger = logging.getLogger(__name__)
 
+# Short ASCII strings (hosts, sources, sourcetypes) are interned up to this length
+INTERN_MAX_LENGTH = 256
+
+# Precompiled layouts: journal header (version, align_bits, base_index_time),
+# the little-endian uint64 stream ID in event headers and the int32 base time
+# in state changes
+_HDR = struct.Struct('<BBI')
+_U64 = struct.Struct('<Q')
+_I32 = struct.Struct('<i')
+
+# Worst-case size of a metadata entry (key plus up to three values, 10 bytes
+# per varint) and the number of entries parsed per reader window. The entry
+# count comes from the stream, so the window is capped instead of sized from it
+METADATA_ENTRY_MAX_SIZE = 4 * 10
+METADATA_ENTRIES_PER_WINDOW = RING_SIZE // METADATA_ENTRY_MAX_SIZE
+
 
 class HeaderDecoder:
     """Decoder for journal header (Opcode.HEADER)."""
@@ -24,8 +43,8 @@ class HeaderDecoder:
     def decode(self, jd: 'JournalDecoder', reader: 'CountedReader', opcode: int) -> None:
         """Decode journal header."""
         # Header structure: version (1 byte), align_bits (1 byte), base_index_time (4 bytes)
-        header_data = reader.read(6)
-        version, align_bits, base_index_time = struct.unpack('<BBI', header_data)
+        header_data = reader.read(_HDR.size)
+        version, align_bits, base_index_time = _HDR.unpack(header_data)
         
         logger.info(f"Journal {jd.name} - Version: {version}")
         align_mask = (1 << align_bits) - 1
@@ -37,15 +56,24 @@ class SplunkPrivateDecoder:
     
     def decode(self, jd: 'JournalDecoder', reader: 'CountedReader', opcode: int) -> None:
         """Skip Splunk private data."""
-        peek = reader.peek(10)
-        length, n = varint.decode_uvarint(peek)
+        reader.ensure(10)
+        length, n = varint.decode_uvarint_at(reader.mv, reader.off)
         if n < 0:
             raise ValueError("Cannot decode length for SPLUNK_PRIVATE")
         
-        reader.discard(n)
+        reader.off += n
         reader.discard(length)
 
 
+# DecoderState list each string opcode appends to
+_FIELD_LISTS = {
+    Opcode.NEW_HOST: 'hosts',
+    Opcode.NEW_SOURCE: 'sources',
+    Opcode.NEW_SOURCE_TYPE: 'source_types',
+    Opcode.NEW_STRING: 'strings',
+}
+
+
 class StringFieldDecoder:
     """Decoder for string fields (host, source, sourcetype, string)."""
     
@@ -57,124 +85,272 @@ class StringFieldDecoder:
             field_opcode: The opcode this decoder handles
         """
         self.field_opcode = field_opcode
+        self._target: Optional[List[str]] = None
+    
+    def bind(self, state: 'DecoderState') -> List[str]:
+        """
+        Bind this decoder to the field list it appends to.
+        
+        Called once per journal so decode() appends straight to the list
+        instead of looking it up on the state for every string.
+        
+        Args:
+            state: Decoder state of the journal being decoded
+            
+        Returns:
+            The bound field list
+        """
+        self._target = getattr(state, _FIELD_LISTS[self.field_opcode])
+        return self._target
     
     def decode(self, jd: 'JournalDecoder', reader: 'CountedReader', opcode: int) -> None:
         """Decode a string field and add to state."""
-        peek = reader.peek(10)
-        length, n = varint.decode_uvarint(peek)
+        reader.ensure(10)
+        length, n = varint.decode_uvarint_at(reader.mv, reader.off)
         if n < 0:
             raise ValueError("Cannot decode string length")
         
-        reader.discard(n)
+        reader.off += n
         string_data = reader.read(length)
-        string_value = string_data.decode('utf-8', errors='replace')
+        if string_data.isascii():
+            string_value = string_data.decode('ascii')
+            # The same few values repeat across journals: share one copy
+            if length < INTERN_MAX_LENGTH:
+                string_value = sys.intern(string_value)
+        else:
+            string_value = string_data.decode('utf-8', errors='replace')
         
-        # Store in the appropriate field list
-        if self.field_opcode not in jd.state.fields:
-            jd.state.fields[self.field_opcode] = []
-        jd.state.fields[self.field_opcode].append(string_value)
+        # Store in the bound field list (unbound decoders look it up)
+        target = self._target
+        if target is None:
+            target = getattr(jd.state, _FIELD_LISTS[self.field_opcode])
+        target.append(string_value)
 
 
-class EventDecoder:
-    """Decoder for event data (Opcode.OLDSTYLE_EVENT*)."""
+def _decode_state_change(buf: memoryview, pos: int, opcode: int) -> Tuple[Optional[int], ...]:
+    """
+    Parse a state change in place.
     
-    def decode(self, jd: 'JournalDecoder', reader: 'CountedReader', opcode: int) -> None:
-        """Decode event data - the most complex decoder."""
-        # Read event metadata
-        peek = reader.peek(8 * 10 + 8 + HASH_SIZE)  # Max varint size * fields + uint64 + hash
-        peek_offset = 0
-        
-        # Message length
-        jd.event.message_length, n = varint.decode_uvarint(peek[peek_offset:])
-        peek_offset += n
+    The opcode's low bits say which fields follow: 0x8 active host, 0x4
+    active source, 0x2 active source type (varints) and 0x1 base time
+    (int32, little endian), in that order.
+    
+    Args:
+        buf: Reader buffer holding the state change
+        pos: Offset in buf right after the state change opcode
+        opcode: The state change opcode (17-31)
+        
+    Returns:
+        Tuple of (active_host, active_source, active_source_type,
+        base_time, end). Fields the opcode does not carry are None; end is
+        the offset in buf after the last field.
+        
+    Raises:
+        ValueError: If a varint cannot be decoded
+        EOFError: If the base time is truncated
+    """
+    decode_uvarint_at = varint.decode_uvarint_at
+    active_host = active_source = active_source_type = base_time = None
+    
+    # Active host
+    if opcode & 0x8:
+        active_host, n = decode_uvarint_at(buf, pos)
         if n < 0:
-            raise ValueError("Cannot decode message_length")
-        
-        # Add current position to message length
-        jd.event.message_length += reader.pos + peek_offset
-        
-        # Extended storage length (if present)
-        e_storage_len = 0
-        jd.event.has_extended_storage = (opcode & 0x4) != 0
-        if jd.event.has_extended_storage:
-            jd.event.extended_storage_len, n = varint.decode_uvarint(peek[peek_offset:])
-            peek_offset += n
-            if n < 0:
-                raise ValueError("Cannot decode extended_storage_len")
-            e_storage_len = jd.event.extended_storage_len
-        
-        # Hash (if present)
-        jd.event.has_hash = (opcode & 0x01) == 0
-        if jd.event.has_hash:
-            jd.event.hash = peek[peek_offset:peek_offset + HASH_SIZE]
-            peek_offset += HASH_SIZE
-        
-        # Stream ID (uint64, little endian)
-        jd.event.stream_id = struct.unpack('<Q', peek[peek_offset:peek_offset + 8])[0]
-        peek_offset += 8
-        
-        # Stream offset
-        jd.event.stream_offset, n = varint.decode_uvarint(peek[peek_offset:])
-        peek_offset += n
+            raise ValueError("Cannot decode active_host")
+        pos += n
+    
+    # Active source
+    if opcode & 0x4:
+        active_source, n = decode_uvarint_at(buf, pos)
         if n < 0:
-            raise ValueError("Cannot decode stream_offset")
-        
-        # Stream sub-offset
-        jd.event.stream_sub_offset, n = varint.decode_uvarint(peek[peek_offset:])
-        peek_offset += n
+            raise ValueError("Cannot decode active_source")
+        pos += n
+    
+    # Active source type
+    if opcode & 0x2:
+        active_source_type, n = decode_uvarint_at(buf, pos)
         if n < 0:
-            raise ValueError("Cannot decode stream_sub_offset")
+            raise ValueError("Cannot decode active_source_type")
+        pos += n
+    
+    # Base time
+    if opcode & 0x1:
+        if pos + 4 > len(buf):
+            raise EOFError(f"Expected 4 bytes, got {len(buf) - pos}")
+        # unpack_from reads straight from the view: about 4x faster than
+        # int.from_bytes on a slice and 2x faster than a cast('i') view
+        base_time = _I32.unpack_from(buf, pos)[0]
+        pos += 4
+    
+    return active_host, active_source, active_source_type, base_time, pos
+
+
+class StateChangeDecoder:
+    """Decoder for state change opcodes (17-31)."""
+    
+    def decode(self, jd: 'JournalDecoder', reader: 'CountedReader', opcode: int) -> None:
+        """
+        Decode a state change.
         
-        # Index time (signed varint + base time)
-        index_time_delta, n = varint.decode_varint(peek[peek_offset:])
-        peek_offset += n
-        if n < 0:
-            raise ValueError("Cannot decode index_time")
-        jd.event.index_time = index_time_delta + jd.state.base_time
+        These opcodes update active host, source, sourcetype, and base time.
+        """
+        # Parse the whole state change in one call on the reader's buffer
+        reader.ensure(3 * 10 + 4)  # Up to three varints + int32 base time
+        active_host, active_source, active_source_type, base_time, reader.off = _decode_state_change(
+            reader.mv, reader.off, opcode
+        )
         
-        # Sub-seconds
-        jd.event.sub_seconds, n = varint.decode_uvarint(peek[peek_offset:])
-        peek_offset += n
-        if n < 0:
-            raise ValueError("Cannot decode sub_seconds")
+        state = jd.state
+        if active_host is not None:
+            state.active_host = active_host
+        if active_source is not None:
+            state.active_source = active_source
+        if active_source_type is not None:
+            state.active_source_type = active_source_type
+        if base_time is not None:
+            state.base_time = base_time
+
+
+def _decode_event_header(buf: memoryview, pos: int, opcode: int, base_time: int) -> Tuple[int, ...]:
+    """
+    Parse the fixed part of an event header in place.
+    
+    The header is decoded into locals only and returned as a flat tuple, so
+    the per-event work does no attribute lookups or stores on the Event.
+    
+    Args:
+        buf: Reader buffer holding the event header
+        pos: Offset in buf right after the event opcode
+        opcode: The event opcode
+        base_time: Current base index time from the decoder state
+        
+    Returns:
+        Tuple of (message_end, extended_storage_len, hash, stream_id,
+        stream_offset, stream_sub_offset, index_time, sub_seconds,
+        metadata_count, header_end). message_end and header_end are
+        offsets in buf; hash is None when the opcode carries no hash.
         
-        # Metadata count
-        jd.event.metadata_count, n = varint.decode_uvarint(peek[peek_offset:])
-        peek_offset += n
+    Raises:
+        ValueError: If a header field cannot be decoded
+    """
+    # Message length (relative to the end of the varint itself)
+    message_length, n = varint.decode_uvarint_at(buf, pos)
+    if n < 0:
+        raise ValueError("Cannot decode message_length")
+    pos += n
+    message_end = pos + message_length
+    
+    # Extended storage length (if present)
+    extended_storage_len = 0
+    if opcode & 0x4:
+        extended_storage_len, n = varint.decode_uvarint_at(buf, pos)
         if n < 0:
-            raise ValueError("Cannot decode metadata_count")
-        
-        # Discard what we've read
-        reader.discard(peek_offset)
-        
-        # Read metadata entries
-        if jd.event.metadata_count > 0:
-            # Read metadata one at a time to avoid buffer issues
-            for _ in range(jd.event.metadata_count):
-                # Peek enough for one metadata entry (conservative estimate)
-                metadata_peek = reader.peek(4 * 10)
-                if len(metadata_peek) == 0:
-                    raise ValueError("Unexpected end of stream while reading metadata")
-                
-                n = read_metadata(metadata_peek, opcode)
-                reader.discard(n)
+            raise ValueError("Cannot decode extended_storage_len")
+        pos += n
+    
+    # Hash (if present)
+    event_hash = None
+    if not opcode & 0x01:
+        event_hash = bytes(buf[pos:pos + HASH_SIZE])
+        pos += HASH_SIZE
+    
+    # Stream ID (uint64, little endian)
+    stream_id = _U64.unpack_from(buf, pos)[0]
+    pos += 8
+    
+    # Stream offset, stream sub-offset, index time, sub-seconds and
+    # metadata count are consecutive varints - decode them in one call
+    values, pos = varint.decode_uvarints(buf, pos, 5)
+    if pos < 0:
+        fields = ("stream_offset", "stream_sub_offset", "index_time", "sub_seconds", "metadata_count")
+        raise ValueError(f"Cannot decode {fields[len(values)]}")
+    stream_offset, stream_sub_offset, index_time, sub_seconds, metadata_count = values
+    
+    # Index time (zigzag encoded signed varint + base time)
+    index_time = ((index_time >> 1) ^ -(index_time & 1)) + base_time
+    
+    return (
+        message_end,
+        extended_storage_len,
+        event_hash,
+        stream_id,
+        stream_offset,
+        stream_sub_offset,
+        index_time,
+        sub_seconds,
+        metadata_count,
+        pos,
+    )
+
+
+class EventDecoder:
+    """Decoder for event data (Opcode.OLDSTYLE_EVENT*)."""
+    
+    def decode(self, jd: 'JournalDecoder', reader: 'CountedReader', opcode: int) -> None:
+        """
+        Decode event data - the most complex decoder.
         
-        # Extended storage (if present)
-        if jd.event.has_extended_storage:
-            e_storage = reader.read(e_storage_len)
-            logger.error(f"Extended storage not fully implemented: {e_storage}")
+        Every Event field is written here, so the reused event needs no
+        reset between events.
+        """
+        # Hoist attribute lookups used on every event into locals
+        ev = jd.event
+        
+        # Parse the header in place on the reader's buffer
+        reader.ensure(8 * 10 + 8 + HASH_SIZE)  # Max varint size * fields + uint64 + hash
+        mv = reader.mv
+        p = reader.off
+        (
+            message_end,
+            ev.extended_storage_len,
+            event_hash,
+            ev.stream_id,
+            ev.stream_offset,
+            ev.stream_sub_offset,
+            ev.index_time,
+            ev.sub_seconds,
+            metadata_count,
+            header_end,
+        ) = _decode_event_header(mv, p, opcode, jd.state.base_time)
+        ev.metadata_count = metadata_count
+        
+        # Message end as an absolute position
+        message_end += reader.pos - p
+        
+        has_extended_storage = ev.has_extended_storage = (opcode & 0x4) != 0
+        if event_hash is not None:
+            ev.has_hash = True
+            ev.hash = event_hash
+        else:
+            ev.has_hash = False
+            ev.hash = _ZERO_HASH
         
-        # Calculate actual message length
-        jd.event.message_length = jd.event.message_length - reader.pos
+        # Advance past the header
+        reader.off = header_end
+        
+        # Read the metadata entries a bounded window at a time
+        remaining = metadata_count
+        while remaining:
+            entries = min(remaining, METADATA_ENTRIES_PER_WINDOW)
+            reader.ensure(METADATA_ENTRY_MAX_SIZE * entries)
+            reader.off += read_metadata_entries(reader.mv, opcode, reader.off, entries)
+            remaining -= entries
+        
+        # Extended storage (if present)
+        if has_extended_storage:
+            e_storage = reader.read(ev.extended_storage_len)
+            logger.error("Extended storage not fully implemented: %s", e_storage)
         
-        # Resize message buffer if needed
-        if len(jd.event.message) < jd.event.message_length:
-            # Allocate double the size to reduce reallocations
-            jd.event.message = bytearray(jd.event.message_length * 2)
+        # Calculate actual message length (the header must fit in the
+        # event's declared length)
+        message_length = message_end - reader.pos
+        if message_length < 0:
+            raise ValueError(f"Event header overruns the event length by {-message_length} bytes")
+        ev.message_length = message_length
         
-        # Read the actual message
-        message_data = reader.read(jd.event.message_length)
-        jd.event.message[:jd.event.message_length] = message_data
+        # Read the actual message as a view over the data read from the
+        # journal, without copying it into a separate message buffer
+        ev.message = reader.view(message_length)
         
         # Include punctuation flag
-        jd.event.include_punctuation = (opcode & 0x22) == 34
+        ev.include_punctuation = (opcode & 0x22) == 34
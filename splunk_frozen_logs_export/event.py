@@ -2,43 +2,60 @@
 Event data structure for Splunk journal entries.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
 
 
 HASH_SIZE = 20
 
+# Default number of events buffered in an EventBatch
+EVENT_BATCH_SIZE = 8192
 
-@dataclass
+# Default message bytes after which an EventBatch is full, however few events
+# it holds (a quarter of an upload shard)
+EVENT_BATCH_BYTES = 8 << 20
+
+# Shared defaults: both are immutable, so every event can reference them
+_ZERO_HASH = bytes(HASH_SIZE)
+_EMPTY_MESSAGE = memoryview(b'')
+
+
+@dataclass(slots=True)
 class Event:
     """
     Represents a single event from a Splunk journal.
     
     Events contain the log message along with metadata about indexing,
     storage, and optional hash values.
+    
+    JournalDecoder reuses a single Event for the whole journal, and message
+    is a zero-copy view into the reader's buffer: both are only valid until
+    the next event is read. Use message_bytes() (or copy the event into an
+    EventBatch) to keep a message.
     """
     
     message_length: int = 0
     has_extended_storage: bool = False
     extended_storage_len: int = 0
     has_hash: bool = False
-    hash: bytes = field(default_factory=lambda: b'\x00' * HASH_SIZE)
+    hash: bytes = _ZERO_HASH
     stream_id: int = 0
     stream_offset: int = 0
     stream_sub_offset: int = 0
     index_time: int = 0
     sub_seconds: int = 0
     metadata_count: int = 0
-    message: bytearray = field(default_factory=bytearray)
+    message: memoryview = _EMPTY_MESSAGE
     include_punctuation: bool = False
     
     def message_bytes(self) -> bytes:
         """Get the message as bytes."""
-        return bytes(self.message[:self.message_length])
+        return bytes(self.message)
     
     def message_string(self) -> str:
         """Get the message as a UTF-8 string."""
-        return self.message[:self.message_length].decode('utf-8', errors='replace')
+        return str(self.message, 'utf-8', 'replace')
     
     def reset(self) -> None:
         """Reset all fields for reuse."""
@@ -46,14 +63,14 @@ class Event:
         self.has_extended_storage = False
         self.extended_storage_len = 0
         self.has_hash = False
-        self.hash = b'\x00' * HASH_SIZE
+        self.hash = _ZERO_HASH
         self.stream_id = 0
         self.stream_offset = 0
         self.stream_sub_offset = 0
         self.index_time = 0
         self.sub_seconds = 0
         self.metadata_count = 0
-        self.message.clear()
+        self.message = _EMPTY_MESSAGE
         self.include_punctuation = False
     
     def __str__(self) -> str:
@@ -71,3 +88,101 @@ class Event:
             f"message: {self.message_string()} - "
             f"includePunctuation: {self.include_punctuation}"
         )
+
+
+class EventBatch:
+    """
+    Column-oriented buffer of decoded events.
+    
+    Instead of one object (and one dict) per event, each exported field is
+    kept in its own column: typed arrays for the integers, plain lists for
+    the (shared) host/source/sourcetype strings, and a single bytes arena
+    for all messages, indexed by end offsets.
+    """
+    
+    def __init__(self, capacity: int = EVENT_BATCH_SIZE, max_bytes: int = EVENT_BATCH_BYTES):
+        """
+        Initialize an empty batch.
+        
+        Args:
+            capacity: Number of events after which the batch is full
+            max_bytes: Message bytes after which the batch is full
+        """
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.host: List[str] = []
+        self.source: List[str] = []
+        self.source_type: List[str] = []
+        self.index_time = array('q')
+        self.stream_id = array('Q')
+        self.stream_offset = array('Q')
+        self._messages = bytearray()
+        self._message_ends = array('Q')
+    
+    def __len__(self) -> int:
+        return len(self._message_ends)
+    
+    def is_full(self) -> bool:
+        """Check if the batch has reached its capacity or byte limit."""
+        return len(self._message_ends) >= self.capacity or len(self._messages) >= self.max_bytes
+    
+    def append(self, host: str, source: str, source_type: str, event: Event) -> None:
+        """
+        Copy an event into the batch.
+        
+        Args:
+            host: Active host of the event
+            source: Active source of the event
+            source_type: Active source type of the event
+            event: The (reused) event to copy from
+        """
+        self.host.append(host)
+        self.source.append(source)
+        self.source_type.append(source_type)
+        self.index_time.append(event.index_time)
+        self.stream_id.append(event.stream_id)
+        self.stream_offset.append(event.stream_offset)
+        self._messages += event.message
+        self._message_ends.append(len(self._messages))
+    
+    def message_string(self, i: int) -> str:
+        """Get the message of the i-th event as a UTF-8 string."""
+        start = self._message_ends[i - 1] if i else 0
+        return str(memoryview(self._messages)[start:self._message_ends[i]], 'utf-8', 'replace')
+    
+    def rows(self) -> Iterator[dict]:
+        """Iterate over the events as export dicts."""
+        # Log data is nearly always ASCII: check the whole arena in one pass
+        # and, if it is, decode it once and slice the text by byte offsets
+        if self._messages.isascii():
+            messages = self._messages.decode('ascii')
+        else:
+            messages = None
+            arena = memoryview(self._messages)
+        start = 0
+        for i, end in enumerate(self._message_ends):
+            if messages is not None:
+                message = messages[start:end]
+            else:
+                message = str(arena[start:end], 'utf-8', 'replace')
+            yield {
+                "host": self.host[i],
+                "source": self.source[i],
+                "sourcetype": self.source_type[i],
+                "index_time": self.index_time[i],
+                "message": message,
+                "stream_id": self.stream_id[i],
+                "stream_offset": self.stream_offset[i]
+            }
+            start = end
+    
+    def clear(self) -> None:
+        """Empty the batch for reuse."""
+        del self.host[:]
+        del self.source[:]
+        del self.source_type[:]
+        del self.index_time[:]
+        del self.stream_id[:]
+        del self.stream_offset[:]
+        del self._messages[:]
+        del self._message_ends[:]
@@ -8,16 +8,203 @@ This module provides utilities for:
 """
 
 from google.cloud import storage
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Iterator, List, Optional, Tuple
 import io
+import json
 import logging
+import sys
+import uuid
 from pathlib import Path
 
 from .journal import JournalDecoder
 from .event import Event
 
+# orjson serializes dicts straight to UTF-8 bytes several times faster than
+# the json module; fall back to json if it is not installed
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
 logger = logging.getLogger(__name__)
 
+# Journals larger than one chunk are downloaded as parallel ranged GETs
+DOWNLOAD_CHUNK_SIZE = 32 << 20
+DOWNLOAD_WORKERS = 8
+
+# Output is buffered into shards of this size, each uploaded in a single request
+UPLOAD_SHARD_SIZE = 32 << 20
+UPLOAD_WORKERS = 2
+
+# GCS accepts at most 32 source objects per compose request
+COMPOSE_MAX_SOURCES = 32
+
+# Console output is written through a buffer of this size
+CONSOLE_BUFFER_SIZE = 1 << 20
+
+# Journal listings are split into concurrent per-prefix listings
+LIST_FANOUT = 16
+LIST_SPLIT_DEPTH = 2
+
+
+def _filter_journals(blobs) -> List[Tuple[str, int]]:
+    """Keep only journal files from a blob listing."""
+    journal_files = []
+    for blob in blobs:
+        # Look for journal.zst or journal files
+        if blob.name.endswith('journal.zst') or blob.name.endswith('/journal'):
+            journal_files.append((blob.name, blob.size))
+            logger.debug(f"Found journal: {blob.name} ({blob.size} bytes)")
+    return journal_files
+
+
+def _download_ranges(
+    bucket: storage.Bucket,
+    blob_path: str,
+    size: int,
+    generation: Optional[int] = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    workers: int = DOWNLOAD_WORKERS
+) -> bytearray:
+    """
+    Download a blob with parallel ranged GETs into a pre-sized buffer.
+    
+    Args:
+        bucket: Bucket containing the blob
+        blob_path: Path to the blob in the bucket
+        size: Size of the blob in bytes
+        generation: Object generation every range is read from, so an
+            overwrite during the download fails instead of mixing versions
+        chunk_size: Size of each ranged request
+        workers: Number of ranges downloaded at the same time
+        
+    Returns:
+        Buffer holding the whole blob
+        
+    Raises:
+        IOError: If a range comes back with an unexpected length
+    """
+    data = bytearray(size)
+    view = memoryview(data)
+    
+    def fetch(start: int) -> None:
+        end = min(start + chunk_size, size)
+        # The end of the requested range is inclusive
+        part = bucket.blob(blob_path, generation=generation).download_as_bytes(start=start, end=end - 1)
+        if len(part) != end - start:
+            raise IOError(f"Expected {end - start} bytes at offset {start} of {blob_path}, got {len(part)}")
+        view[start:end] = part
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() re-raises the first download error, if any
+        list(executor.map(fetch, range(0, size, chunk_size)))
+    
+    return data
+
+
+class _ShardedBlobWriter:
+    """
+    Write a blob as pre-encoded shards uploaded in the background.
+    
+    Output that fits in a single shard is uploaded with one request when the
+    writer is closed. Larger output is uploaded shard by shard on a small
+    thread pool while decoding continues, then stitched together server-side
+    with GCS compose, so the data is never re-uploaded.
+    """
+    
+    def __init__(
+        self,
+        bucket: storage.Bucket,
+        output_path: str,
+        shard_size: int = UPLOAD_SHARD_SIZE,
+        workers: int = UPLOAD_WORKERS
+    ):
+        """
+        Initialize a sharded writer.
+        
+        Args:
+            bucket: Destination bucket
+            output_path: Path of the final blob in the bucket
+            shard_size: Buffered bytes per uploaded shard
+            workers: Number of shards uploaded at the same time
+        """
+        self.bucket = bucket
+        self.output_path = output_path
+        self.shard_size = shard_size
+        self._workers = workers
+        self._buf = io.BytesIO()
+        # Shard names are unique per writer: journals from different
+        # indexes can share an output path and be written at the same time
+        self._token = uuid.uuid4().hex
+        self._parts: List[storage.Blob] = []
+        self._pending: List[Future] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def write(self, data: bytes) -> None:
+        """Append data, uploading a shard once the buffer is full."""
+        self._buf.write(data)
+        if self._buf.tell() >= self.shard_size:
+            self._upload_shard()
+    
+    def _upload_shard(self) -> None:
+        """Hand the current buffer off to a background upload."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        
+        # Bound memory use to the shards in flight
+        while len(self._pending) >= self._workers:
+            self._pending.pop(0).result()
+        
+        part = self.bucket.blob(f"{self.output_path}.part-{self._token}-{len(self._parts):05d}")
+        self._parts.append(part)
+        self._pending.append(self._executor.submit(self._upload, part, self._buf))
+        self._buf = io.BytesIO()
+    
+    @staticmethod
+    def _upload(blob: storage.Blob, buf: io.BytesIO) -> None:
+        blob.upload_from_file(buf, rewind=True, content_type="application/json")
+    
+    def close(self) -> None:
+        """Upload any remaining data and assemble the final blob."""
+        target = self.bucket.blob(self.output_path)
+        
+        if not self._parts:
+            # Everything fit in one shard: a single upload, no compose needed
+            self._upload(target, self._buf)
+            return
+        
+        if self._buf.tell():
+            self._upload_shard()
+        try:
+            for future in self._pending:
+                future.result()
+        finally:
+            self._executor.shutdown()
+        
+        # Compose in groups, folding the partial result into each next group
+        target.content_type = "application/json"
+        target.compose(self._parts[:COMPOSE_MAX_SOURCES])
+        for i in range(COMPOSE_MAX_SOURCES, len(self._parts), COMPOSE_MAX_SOURCES - 1):
+            target.compose([target] + self._parts[i:i + COMPOSE_MAX_SOURCES - 1])
+        
+        for part in self._parts:
+            part.delete()
+    
+    def abort(self) -> None:
+        """Discard buffered data and remove any shards already uploaded."""
+        if self._executor is not None:
+            for future in self._pending:
+                future.exception()
+            self._executor.shutdown()
+        for part in self._parts:
+            try:
+                part.delete()
+            except Exception as e:
+                logger.warning(f"Could not delete partial upload gs://{self.bucket.name}/{part.name}: {e}")
+
 
 class GCSJournalReader:
     """Read and process Splunk journal files from Google Cloud Storage."""
@@ -46,23 +233,76 @@ class GCSJournalReader:
         bucket = self.client.bucket(bucket_name)
         blobs = bucket.list_blobs(prefix=prefix)
         
+        journal_files = _filter_journals(blobs)
+        
+        logger.info(f"Found {len(journal_files)} journal files in gs://{bucket_name}/{prefix}")
+        return journal_files
+    
+    def list_journal_files_parallel(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        fanout: int = LIST_FANOUT
+    ) -> List[Tuple[str, int]]:
+        """
+        List all journal files in a GCS bucket using concurrent listings.
+        
+        The prefix is split along "/" boundaries (up to LIST_SPLIT_DEPTH
+        levels, e.g. index and bucket directories) and each sub-prefix is
+        listed on its own thread, so paginating a large bucket costs the
+        slowest sub-listing instead of the sum of all pages. A level is only
+        split into when it yields between 2 and `fanout` sub-prefixes, so
+        the number of listings stays bounded by `fanout`; when the prefix
+        does not split, this is a single listing like list_journal_files.
+        
+        Args:
+            bucket_name: Name of the GCS bucket
+            prefix: Optional prefix to filter files (e.g., "frozen/")
+            fanout: Number of listings run at the same time
+            
+        Returns:
+            List of tuples (blob_path, size_bytes), sorted by path
+        """
+        bucket = self.client.bucket(bucket_name)
         journal_files = []
-        for blob in blobs:
-            # Look for journal.zst or journal files
-            if blob.name.endswith('journal.zst') or blob.name.endswith('/journal'):
-                journal_files.append((blob.name, blob.size))
-                logger.debug(f"Found journal: {blob.name} ({blob.size} bytes)")
+        prefixes = [prefix]
+        
+        def list_level(sub_prefix: str) -> Tuple[List[Tuple[str, int]], List[str]]:
+            iterator = bucket.list_blobs(prefix=sub_prefix, delimiter='/')
+            found = _filter_journals(iterator)
+            # Sub-prefixes are only populated once the pages have been consumed
+            return found, sorted(iterator.prefixes)
+        
+        def list_flat(sub_prefix: str) -> List[Tuple[str, int]]:
+            return _filter_journals(bucket.list_blobs(prefix=sub_prefix))
         
+        with ThreadPoolExecutor(max_workers=max(1, fanout)) as executor:
+            for _ in range(LIST_SPLIT_DEPTH):
+                levels = list(executor.map(list_level, prefixes))
+                next_prefixes = [p for _, sub_prefixes in levels for p in sub_prefixes]
+                # Too few sub-prefixes gain nothing over one listing and too
+                # many cost a request each: keep listing the current level
+                if not 1 < len(next_prefixes) <= fanout:
+                    break
+                for found, _ in levels:
+                    journal_files.extend(found)
+                prefixes = next_prefixes
+            
+            for found in executor.map(list_flat, prefixes):
+                journal_files.extend(found)
+        
+        journal_files.sort()
         logger.info(f"Found {len(journal_files)} journal files in gs://{bucket_name}/{prefix}")
         return journal_files
     
-    def open_journal_from_gcs(self, bucket_name: str, blob_path: str) -> JournalDecoder:
+    def open_journal_from_gcs(self, bucket_name: str, blob_path: str, size: Optional[int] = None) -> JournalDecoder:
         """
         Open and decode a journal file from GCS.
         
         Args:
             bucket_name: Name of the GCS bucket
             blob_path: Path to the journal file in the bucket
+            size: Size of the journal in bytes (looked up if not given)
             
         Returns:
             JournalDecoder instance ready for iteration
@@ -78,34 +318,23 @@ class GCSJournalReader:
         
         logger.info(f"Downloading journal from gs://{bucket_name}/{blob_path}")
         
-        # Download to memory
-        journal_data = blob.download_as_bytes()
-        logger.info(f"Downloaded {len(journal_data)} bytes")
+        if size is None or size > DOWNLOAD_CHUNK_SIZE:
+            # Ranged downloads need the current size and generation, so all
+            # ranges come from the same version of the object
+            blob.reload()
+            size = blob.size
         
-        # Create a file-like object
-        journal_file = io.BytesIO(journal_data)
+        # Download to memory, in parallel ranges for large journals
+        if size > DOWNLOAD_CHUNK_SIZE:
+            journal_data = _download_ranges(bucket, blob_path, size, blob.generation)
+        else:
+            journal_data = blob.download_as_bytes()
+        logger.info(f"Downloaded {len(journal_data)} bytes")
         
         # Determine if it's compressed based on file extension
         is_compressed = blob_path.endswith('.zst')
         
-        # For now, save to temp file for JournalDecoder
-        # TODO: Modify JournalDecoder to accept file-like objects
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zst' if is_compressed else '') as tmp:
-            tmp.write(journal_data)
-            tmp_path = tmp.name
-        
-        # Create a temporary bucket directory structure
-        temp_bucket = Path(tmp_path).parent / "temp_bucket"
-        temp_bucket.mkdir(exist_ok=True)
-        rawdata_dir = temp_bucket / "rawdata"
-        rawdata_dir.mkdir(exist_ok=True)
-        
-        # Move file to expected location
-        final_path = rawdata_dir / ("journal.zst" if is_compressed else "journal")
-        Path(tmp_path).rename(final_path)
-        
-        return JournalDecoder(str(temp_bucket))
+        return JournalDecoder.from_bytes(journal_data, blob_path, is_compressed)
     
     def process_bucket(
         self,
@@ -113,98 +342,163 @@ class GCSJournalReader:
         prefix: str = "",
         output_format: str = "jsonl",
         output_bucket: Optional[str] = None,
-        output_prefix: str = "decoded/"
+        output_prefix: str = "decoded/",
+        concurrency: int = 1
     ) -> int:
         """
         Process all journal files in a GCS bucket.
         
+        Journals are independent, so up to `concurrency` of them are
+        downloaded and decoded at the same time on a thread pool. Each one
+        holds its whole download plus its output buffers, so memory use
+        grows with concurrency.
+        
         Args:
             bucket_name: Source bucket containing journal files
             prefix: Prefix to filter journal files
             output_format: Output format ("jsonl", "json", or "bigquery")
             output_bucket: Destination bucket for output (if None, uses source bucket)
             output_prefix: Prefix for output files
+            concurrency: Number of journals processed in parallel
             
         Returns:
             Total number of events processed
+            
+        Raises:
+            ValueError: If concurrency is less than 1
         """
-        journal_files = self.list_journal_files(bucket_name, prefix)
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        
+        journal_files = self.list_journal_files_parallel(bucket_name, prefix)
         total_events = 0
         
         output_bucket = output_bucket or bucket_name
         
-        for blob_path, size in journal_files:
-            logger.info(f"Processing {blob_path} ({size} bytes)")
-            
-            try:
-                decoder = self.open_journal_from_gcs(bucket_name, blob_path)
-                
-                # Collect events
-                events_from_journal = 0
-                for event in decoder:
-                    # Serialize event to dict
-                    event_dict = {
-                        "host": decoder.host,
-                        "source": decoder.source,
-                        "sourcetype": decoder.source_type,
-                        "index_time": event.index_time,
-                        "message": event.message_string(),
-                        "stream_id": event.stream_id,
-                        "stream_offset": event.stream_offset
-                    }
-                    
-                    if output_format == "console":
-                        # Print to stdout for Cloud Run Jobs debugging
-                        print(json.dumps(event_dict))
-                    elif output_format in ["jsonl", "json"]:
-                        # Collect for batch writing to GCS
-                        if 'events' not in locals():
-                            events = []
-                        events.append(event_dict)
-                    
-                    events_from_journal += 1
-                
-                total_events += events_from_journal
-                logger.info(f"Decoded {events_from_journal} events from {blob_path}")
-                
-                # Write output for GCS formats
-                if output_format in ["json", "jsonl"] and 'events' in locals() and events:
-                    self._write_to_gcs(events, output_bucket, blob_path, output_prefix, output_format)
-                
-            except Exception as e:
-                logger.error(f"Error processing {blob_path}: {e}")
-                continue
+        # Console output goes straight to stdout's binary layer through one
+        # large shared buffer instead of a print per batch
+        console_out = None
+        if output_format == "console":
+            sys.stdout.flush()
+            console_out = io.BufferedWriter(sys.stdout.buffer, buffer_size=CONSOLE_BUFFER_SIZE)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [
+                    executor.submit(
+                        self._process_one_journal,
+                        bucket_name,
+                        blob_path,
+                        size,
+                        output_format,
+                        output_bucket,
+                        output_prefix,
+                        console_out
+                    )
+                    for blob_path, size in journal_files
+                ]
+                for future in as_completed(futures):
+                    total_events += future.result()
+        finally:
+            if console_out is not None:
+                console_out.flush()
+                # Detach so stdout itself is not closed with the wrapper
+                console_out.detach()
         
         logger.info(f"Processed {len(journal_files)} journals, {total_events} total events")
         return total_events
     
-    def _write_to_gcs(
+    def _process_one_journal(
         self,
-        events: List[dict],
         bucket_name: str,
-        source_path: str,
+        blob_path: str,
+        size: int,
+        output_format: str,
+        output_bucket: str,
         output_prefix: str,
-        output_format: str
-    ):
-        """Write events to GCS in specified format."""
-        import json
+        console_out: Optional[io.BufferedWriter] = None
+    ) -> int:
+        """
+        Download, decode and write out a single journal.
         
-        # Generate output path
-        source_name = Path(source_path).parent.parent.name  # Get bucket directory name
-        output_path = f"{output_prefix}{source_name}.{output_format}"
+        console_out is the shared stdout writer for the "console" format.
         
-        bucket = self.client.bucket(bucket_name)
-        blob = bucket.blob(output_path)
+        Returns:
+            Number of events decoded (0 if the journal failed)
+        """
+        logger.info(f"Processing {blob_path} ({size} bytes)")
         
-        if output_format == "jsonl":
-            # JSON Lines format
-            output = "\n".join(json.dumps(event) for event in events)
-        else:
-            # JSON array format
-            output = json.dumps(events, indent=2)
+        writer = None
+        try:
+            decoder = self.open_journal_from_gcs(bucket_name, blob_path, size)
+            
+            # Decode events in column-wise batches and stream each to the output
+            events_from_journal = 0
+            
+            # Rows are written one at a time as they are serialized, so no
+            # more than one batch is held in memory
+            for batch in decoder.batches():
+                events_from_journal += len(batch)
+                if output_format == "console":
+                    # Write to stdout for Cloud Run Jobs debugging; one write
+                    # per line keeps lines from concurrent journals whole
+                    write = console_out.write
+                    for row in batch.rows():
+                        write(_dumps(row) + b"\n")
+                elif output_format == "jsonl":
+                    if writer is None:
+                        writer = self._open_gcs_writer(output_bucket, blob_path, output_prefix, output_format)
+                    write = writer.write
+                    for row in batch.rows():
+                        write(_dumps(row) + b"\n")
+                elif output_format == "json":
+                    if writer is None:
+                        writer = self._open_gcs_writer(output_bucket, blob_path, output_prefix, output_format)
+                        separator = b"[\n"
+                    write = writer.write
+                    for row in batch.rows():
+                        write(separator)
+                        write(_dumps(row))
+                        separator = b",\n"
+            
+            logger.info(f"Decoded {events_from_journal} events from {blob_path}")
+            
+            if console_out is not None:
+                console_out.flush()
+            
+            # Finish the upload for GCS formats
+            if writer is not None:
+                if output_format == "json":
+                    writer.write(b"\n]\n")
+                writer.close()
+                logger.info(f"Wrote {events_from_journal} events to gs://{output_bucket}/{writer.output_path}")
+            
+            return events_from_journal
+        
+        except Exception as e:
+            logger.error(f"Error processing {blob_path}: {e}")
+            if writer is not None:
+                writer.abort()
+            return 0
+    
+    def _open_gcs_writer(
+        self,
+        bucket_name: str,
+        source_path: str,
+        output_prefix: str,
+        output_format: str
+    ) -> _ShardedBlobWriter:
+        """Open a sharded writer for a journal's output."""
+        # Generate output path from the index and bucket directory names:
+        # bucket directories repeat across indexes (db_1 in every index), and
+        # journals sharing an output path would overwrite each other
+        bucket_dir = Path(source_path).parent.parent
+        source_name = bucket_dir.name
+        if bucket_dir.parent.name:
+            source_name = f"{bucket_dir.parent.name}.{source_name}"
+        output_path = f"{output_prefix}{source_name}.{output_format}"
         
-        blob.upload_from_string(output, content_type="application/json")
-        logger.info(f"Wrote {len(events)} events to gs://{bucket_name}/{output_path}")
+        return _ShardedBlobWriter(self.client.bucket(bucket_name), output_path)
 
 
 def list_buckets_in_gcs(bucket_name: str, prefix: str = "frozen/") -> List[str]:
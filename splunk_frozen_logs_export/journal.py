@@ -2,26 +2,65 @@
 Main journal decoder for Splunk journal files.
 """
 
-import io
 import os
+import mmap
 import logging
+import traceback
 from pathlib import Path
-from typing import Iterator, Dict, List, Optional
+from typing import BinaryIO, Callable, Iterator, List, Optional, Union
 from dataclasses import dataclass, field
 
 import zstandard as zstd
 
 from .reader import CountedReader
-from .event import Event
-from .opcode import Opcode, get_decoder
+from .event import EVENT_BATCH_BYTES, EVENT_BATCH_SIZE, Event, EventBatch
+from .opcode import Decoder, Opcode, get_decoder_table
+from .decoder import StringFieldDecoder
 
 logger = logging.getLogger(__name__)
 
+# Event opcodes (1, 2 and 32-43) flagged by opcode byte, so the per-opcode
+# check is a single index instead of a chain of comparisons
+_EVENT_OPCODE = bytes(1 if opcode in (1, 2) or 32 <= opcode <= 43 else 0 for opcode in range(256))
 
-@dataclass
+# Compressed journals are read from their source in chunks of this size
+ZSTD_READ_SIZE = 1 << 20
+
+
+def _decode_nop(jd: 'JournalDecoder', reader: CountedReader, opcode: int) -> None:
+    """Handle NOP (0x00) - just skip it."""
+
+
+def _decode_unknown(jd: 'JournalDecoder', reader: CountedReader, opcode: int) -> None:
+    """Handle an opcode with no decoder."""
+    raise ValueError(f"Unknown opcode: 0x{opcode:02x}")
+
+
+def _map_local_file(journal_path: Path) -> Union[mmap.mmap, bytes]:
+    """
+    Memory-map a local journal file read-only for one sequential pass.
+    
+    The kernel pages the file in on demand straight from the page cache,
+    without a copy into Python buffers, and where supported is told the
+    access is sequential so it reads ahead and drops pages already read.
+    Empty files cannot be mapped and come back as empty bytes.
+    """
+    with open(journal_path, 'rb') as file_handle:
+        if os.fstat(file_handle.fileno()).st_size == 0:
+            return b''
+        mapped = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+@dataclass(slots=True)
 class DecoderState:
     """State maintained across journal decoding."""
-    fields: Dict[int, List[str]] = field(default_factory=dict)
+    hosts: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    source_types: List[str] = field(default_factory=list)
+    strings: List[str] = field(default_factory=list)
     base_time: int = 0
     active_host: int = 0
     active_source: int = 0
@@ -35,21 +74,73 @@ class JournalDecoder:
     Provides an iterator interface for reading events from a journal.
     """
     
-    def __init__(self, path: str):
+    def __init__(self, path: str, stream: Optional[Union[BinaryIO, CountedReader]] = None):
         """
         Initialize a journal decoder.
         
         Args:
             path: Path to the bucket directory containing rawdata/journal.zst
+                (only used as the journal name when stream is given)
+            stream: Already opened, decompressed journal stream (any object
+                with a readinto() method, or a ready CountedReader)
         """
         self.name = path
-        self.reader = CountedReader(self._open_journal(path))
+        if stream is None:
+            self.reader = self._open_journal(path)
+        elif isinstance(stream, CountedReader):
+            self.reader = stream
+        else:
+            self.reader = CountedReader(stream)
         self.state = DecoderState()
         self.event = Event()
         self.opcode = 0
+        
+        # Per-journal copy of the opcode jump table. String decoders are bound
+        # to this journal's state, so each journal gets its own instances
+        # (journals may be decoded concurrently)
+        self._decoders: List[Optional[Decoder]] = list(get_decoder_table())
+        for string_opcode in (Opcode.NEW_HOST, Opcode.NEW_SOURCE, Opcode.NEW_SOURCE_TYPE, Opcode.NEW_STRING):
+            string_decoder = StringFieldDecoder(string_opcode)
+            string_decoder.bind(self.state)
+            self._decoders[string_opcode] = string_decoder
+        
+        # One decode callable per opcode byte, so dispatch in __next__ is a
+        # single index and call with no checks in between. The callables
+        # take the decoder as an argument rather than binding it, so the
+        # decoder (and the journal data it holds) is freed by refcount
+        self._handlers: List[Callable[['JournalDecoder', CountedReader, int], None]] = [_decode_unknown] * 256
+        self._handlers[Opcode.NOP] = _decode_nop
+        for handler_opcode, decoder in enumerate(self._decoders):
+            if decoder is not None:
+                self._handlers[handler_opcode] = decoder.decode
         self._error: Optional[Exception] = None
     
-    def _open_journal(self, path: str) -> io.BufferedReader:
+    @classmethod
+    def from_bytes(cls, data: bytes, name: str, compressed: bool) -> 'JournalDecoder':
+        """
+        Create a decoder over a journal held in memory.
+        
+        Args:
+            data: Raw journal file contents (bytes or bytearray)
+            name: Name used to identify the journal in logs
+            compressed: Whether data is zstd compressed (journal.zst)
+            
+        Returns:
+            JournalDecoder instance ready for iteration
+        """
+        if compressed:
+            # stream_reader reads straight from any buffer-protocol object and
+            # decompresses on demand as the reader asks for more bytes, so
+            # decoding starts with the first chunk instead of after the
+            # whole journal has been decompressed
+            source = zstd.ZstdDecompressor().stream_reader(data, read_size=ZSTD_READ_SIZE)
+            # stream_reader implements readinto(), so CountedReader
+            # decompresses straight into its own buffer
+            return cls(name, source)
+        # Uncompressed journals are decoded in place on the downloaded buffer
+        return cls(name, CountedReader.from_buffer(data))
+    
+    def _open_journal(self, path: str) -> CountedReader:
         """
         Open and decompress a journal file.
         
@@ -57,7 +148,7 @@ class JournalDecoder:
             path: Path to the bucket directory
             
         Returns:
-            Buffered reader for the decompressed journal
+            Reader over the decompressed journal
             
         Raises:
             FileNotFoundError: If journal doesn't exist
@@ -67,121 +158,44 @@ class JournalDecoder:
         # Try .zst first (compressed)
         journal_path = journal_dir / "journal.zst"
         if journal_path.exists():
-            file_handle = open(journal_path, 'rb')
             dctx = zstd.ZstdDecompressor()
-            decompressed = dctx.stream_reader(file_handle)
-            return io.BufferedReader(decompressed, buffer_size=8 * 4096)
+            decompressed = dctx.stream_reader(_map_local_file(journal_path), read_size=ZSTD_READ_SIZE)
+            return CountedReader(decompressed)
         
-        # Try uncompressed journal
+        # Try uncompressed journal - decoded in place on the mapping
         journal_path = journal_dir / "journal"
         if journal_path.exists():
-            file_handle = open(journal_path, 'rb')
-            return io.BufferedReader(file_handle, buffer_size=8 * 4096)
+            return CountedReader.from_buffer(_map_local_file(journal_path))
         
         raise FileNotFoundError(f"Journal not found at {journal_dir}/journal.zst or {journal_dir}/journal")
     
     @property
     def host(self) -> str:
         """Get the current active host."""
-        if self.state.active_host > 0:
-            hosts = self.state.fields.get(Opcode.NEW_HOST, [])
-            if self.state.active_host <= len(hosts):
-                return hosts[self.state.active_host - 1]
+        state = self.state
+        active_host = state.active_host
+        if 0 < active_host <= len(state.hosts):
+            return state.hosts[active_host - 1]
         return ""
     
     @property
     def source(self) -> str:
         """Get the current active source."""
-        if self.state.active_source > 0:
-            sources = self.state.fields.get(Opcode.NEW_SOURCE, [])
-            if self.state.active_source <= len(sources):
-                return sources[self.state.active_source - 1]
+        state = self.state
+        active_source = state.active_source
+        if 0 < active_source <= len(state.sources):
+            return state.sources[active_source - 1]
         return ""
     
     @property
     def source_type(self) -> str:
         """Get the current active source type."""
-        if self.state.active_source_type > 0:
-            source_types = self.state.fields.get(Opcode.NEW_SOURCE_TYPE, [])
-            if self.state.active_source_type <= len(source_types):
-                return source_types[self.state.active_source_type - 1]
+        state = self.state
+        active_source_type = state.active_source_type
+        if 0 < active_source_type <= len(state.source_types):
+            return state.source_types[active_source_type - 1]
         return ""
     
-    def _is_event_opcode(self, opcode: int) -> bool:
-        """Check if an opcode represents an event."""
-        return (
-            opcode == Opcode.OLDSTYLE_EVENT or
-            opcode == Opcode.OLDSTYLE_EVENT_WITH_HASH or
-            (32 <= opcode <= 43)
-        )
-    
-    def _decode_new_state(self, opcode: int) -> None:
-        """
-        Decode state change opcodes (17-31).
-        
-        These opcodes update active host, source, sourcetype, and base time.
-        """
-        from . import varint
-        
-        # Active host
-        if opcode & 0x8:
-            peek = self.reader.peek(10)
-            self.state.active_host, n = varint.decode_uvarint(peek)
-            if n < 0:
-                raise ValueError("Cannot decode active_host")
-            self.reader.discard(n)
-        
-        # Active source
-        if opcode & 0x4:
-            peek = self.reader.peek(10)
-            self.state.active_source, n = varint.decode_uvarint(peek)
-            if n < 0:
-                raise ValueError("Cannot decode active_source")
-            self.reader.discard(n)
-        
-        # Active source type
-        if opcode & 0x2:
-            peek = self.reader.peek(10)
-            self.state.active_source_type, n = varint.decode_uvarint(peek)
-            if n < 0:
-                raise ValueError("Cannot decode active_source_type")
-            self.reader.discard(n)
-        
-        # Base time
-        if opcode & 0x1:
-            import struct
-            base_time_data = self.reader.read(4)
-            self.state.base_time = struct.unpack('<i', base_time_data)[0]
-    
-    def _decode_next(self) -> None:
-        """Decode the next opcode."""
-        # Handle NOP (0x00) - just skip it
-        if self.opcode == 0:
-            return
-        
-        # Handle state change opcodes (17-31) first - these are not in the enum
-        if 17 <= self.opcode <= 31:
-            self._decode_new_state(self.opcode)
-            return
-        
-        # Handle event opcodes (32-43) - also not all in the enum
-        if self._is_event_opcode(self.opcode):
-            from .decoder import EventDecoder
-            EventDecoder().decode(self, self.reader, self.opcode)
-            return
-        
-        # Try specific decoder for known opcodes
-        try:
-            decoder = get_decoder(Opcode(self.opcode))
-            if decoder is not None:
-                decoder.decode(self, self.reader, self.opcode)
-                return
-        except ValueError:
-            # Opcode not in enum, will be caught below
-            pass
-        
-        raise ValueError(f"Unknown opcode: 0x{self.opcode:02x}")
-    
     def __iter__(self) -> Iterator[Event]:
         """Iterate over events in the journal."""
         return self
@@ -196,32 +210,76 @@ class JournalDecoder:
         Raises:
             StopIteration: When end of journal is reached
         """
+        # Decoding stops for good at the first error
+        if self._error is not None:
+            raise StopIteration
+        
+        reader = self.reader
+        handlers = self._handlers
+        # Checked once per call so disabled debug logging costs nothing per opcode
+        debug = logger.isEnabledFor(logging.DEBUG)
         while True:
             try:
-                self.opcode = self.reader.read_byte()
-                logger.debug(f"Read opcode: 0x{self.opcode:02x} at position {self.reader.pos-1}")
+                # Take the opcode straight from the reader's buffer; only
+                # go through read_byte() when the buffer needs a refill
+                off = reader.off
+                if off < len(reader.mv):
+                    self.opcode = reader.mv[off]
+                    reader.off = off + 1
+                else:
+                    self.opcode = reader.read_byte()
+                if debug:
+                    logger.debug("Read opcode: 0x%02x at position %d", self.opcode, reader.pos - 1)
             except EOFError:
                 logger.debug("End of file reached")
                 raise StopIteration
             
-            # Reset event if this is an event opcode
-            if self._is_event_opcode(self.opcode):
-                self.event.reset()
+            # The event is reused as is: EventDecoder overwrites every field
+            is_event = _EVENT_OPCODE[self.opcode]
             
             try:
-                self._decode_next()
+                handlers[self.opcode](self, reader, self.opcode)
             except Exception as e:
-                import traceback
                 logger.error(f"Error decoding opcode 0x{self.opcode:02x} at position {self.reader.pos}: {e}")
-                logger.debug(f"Traceback: {traceback.format_exc()}")
+                if debug:
+                    logger.debug("Traceback: %s", traceback.format_exc())
                 self._error = e
                 raise StopIteration
             
             # If this was an event opcode, return the event
-            if self._is_event_opcode(self.opcode):
-                logger.debug(f"Returning event")
+            if is_event:
+                if debug:
+                    logger.debug("Returning event")
                 return self.event
     
+    def batches(self, n: int = EVENT_BATCH_SIZE, max_bytes: int = EVENT_BATCH_BYTES) -> Iterator[EventBatch]:
+        """
+        Iterate over the events in column-wise batches.
+        
+        Each event is copied into the batch together with its active host,
+        source and source type, so a batch stays valid after decoding moves
+        on. The same EventBatch is cleared and refilled for every batch:
+        consume it before asking for the next one.
+        
+        Args:
+            n: Number of events per batch (the last one may be smaller)
+            max_bytes: Message bytes after which a batch is yielded early,
+                so batches of large events stay bounded in size
+            
+        Returns:
+            Iterator of EventBatch
+        """
+        batch = EventBatch(n, max_bytes)
+        append = batch.append
+        is_full = batch.is_full
+        for event in self:
+            append(self.host, self.source, self.source_type, event)
+            if is_full():
+                yield batch
+                batch.clear()
+        if len(batch):
+            yield batch
+    
     def error(self) -> Optional[Exception]:
         """Get any error that occurred during decoding."""
         return self._error
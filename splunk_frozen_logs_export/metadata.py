@@ -2,14 +2,12 @@
 Metadata type definitions and parser for Splunk journal format.
 """
 
-from dataclasses import dataclass
-from typing import Tuple
+from typing import NamedTuple, Tuple
 from . import varint
 
 
-@dataclass
-class RawdataMetaKeyItemType:
-    """Metadata type information."""
+class RawdataMetaKeyItemType(NamedTuple):
+    """Metadata type information (an immutable value, so a plain tuple)."""
     representation: int
     extra_ints_needed: int
     
@@ -33,7 +31,7 @@ RMKI_TYPE_OFFSET_LEN_WENCODING = RawdataMetaKeyItemType(12, 3)
 RMKI_TYPE_FLOAT64_PRECISION = RawdataMetaKeyItemType(14, 2)
 RMKI_TYPE_FLOAT64_SIGFIGS_PRECISION = RawdataMetaKeyItemType(15, 0)
 
-VALUES_IN_ORDER = [
+VALUES_IN_ORDER = (
     RMKI_TYPE_STRING,
     RawdataMetaKeyItemType(0, 0),  # placeholder
     RMKI_TYPE_FLOAT32,
@@ -50,7 +48,11 @@ VALUES_IN_ORDER = [
     RawdataMetaKeyItemType(0, 0),  # placeholder
     RMKI_TYPE_FLOAT64_PRECISION,
     RMKI_TYPE_FLOAT64_SIGFIGS_PRECISION,
-]
+)
+
+
+# extra_ints_needed by combined type, for lookups by plain index
+_EXTRA_INTS = bytes(t.extra_ints_needed for t in VALUES_IN_ORDER)
 
 
 def get_type_from_combined(v: int) -> RawdataMetaKeyItemType:
@@ -58,13 +60,14 @@ def get_type_from_combined(v: int) -> RawdataMetaKeyItemType:
     return VALUES_IN_ORDER[v & 0xF]
 
 
-def read_metadata(peek: bytes, opcode: int) -> int:
+def read_metadata(peek: varint.Buffer, opcode: int, offset: int = 0) -> int:
     """
     Read metadata from a peeked buffer.
     
     Args:
-        peek: Peeked byte buffer
+        peek: Peeked byte buffer (or a memoryview over the reader's buffer)
         opcode: The event opcode
+        offset: Position of the metadata entry in peek
         
     Returns:
         Number of bytes consumed
@@ -72,10 +75,10 @@ def read_metadata(peek: bytes, opcode: int) -> int:
     Raises:
         ValueError: If varint cannot be decoded
     """
-    meta_key, n = varint.decode_uvarint(peek)
+    meta_key, n = varint.decode_uvarint_at(peek, offset)
     if n < 0:
         raise ValueError("Cannot read varint for meta_key")
-    peek_offset = n
+    peek_offset = offset + n
     
     num_to_read = -1
     
@@ -92,10 +95,63 @@ def read_metadata(peek: bytes, opcode: int) -> int:
         num_to_read = t.extra_ints_needed
     
     for _ in range(num_to_read):
-        long_val, n = varint.decode_varint(peek[peek_offset:])
+        long_val, n = varint.decode_varint_at(peek, peek_offset)
         if n < 0:
             raise ValueError("Cannot read varint for metadata value")
         peek_offset += n
         # TODO: Add long_val
     
-    return peek_offset
+    return peek_offset - offset
+
+
+def read_metadata_entries(buf: varint.Buffer, opcode: int, offset: int, count: int) -> int:
+    """
+    Read all metadata entries of an event in one call.
+    
+    Equivalent to calling read_metadata count times, but the per-entry work
+    is straight-line: the value count comes from a byte table and, as the
+    values are not kept yet, they are skipped without being decoded.
+    
+    Args:
+        buf: Byte buffer (or a memoryview over the reader's buffer)
+        opcode: The event opcode
+        offset: Position of the first metadata entry in buf
+        count: Number of metadata entries
+        
+    Returns:
+        Number of bytes consumed
+        
+    Raises:
+        ValueError: If the entries are truncated or a varint cannot be decoded
+    """
+    decode_uvarint_at = varint.decode_uvarint_at
+    end = len(buf)
+    pos = offset
+    
+    # Old-style events have one value per entry; newer ones look the count
+    # up from the combined type (meta_key shifted for opcodes below 36)
+    oldstyle = opcode <= 2
+    shift = 2 if opcode < 36 else 0
+    
+    for _ in range(count):
+        if pos >= end:
+            raise ValueError("Unexpected end of stream while reading metadata")
+        
+        meta_key, n = decode_uvarint_at(buf, pos)
+        if n < 0:
+            raise ValueError("Cannot read varint for meta_key")
+        pos += n
+        # TODO: Add metaKey
+        
+        num_to_read = 1 if oldstyle else _EXTRA_INTS[(meta_key << shift) & 0xF]
+        for _ in range(num_to_read):
+            # TODO: Add long_val (skipped: only the varint's length matters)
+            while True:
+                if pos >= end:
+                    raise ValueError("Cannot read varint for metadata value")
+                b = buf[pos]
+                pos += 1
+                if b < 0x80:
+                    break
+    
+    return pos - offset
@@ -3,7 +3,7 @@ Opcode definitions and decoder registry for Splunk journal format.
 """
 
 from enum import IntEnum
-from typing import Protocol, Optional, TYPE_CHECKING
+from typing import List, Protocol, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .journal import JournalDecoder
@@ -40,6 +40,55 @@ class Decoder(Protocol):
         ...
 
 
+# Jump table indexed by opcode byte, built on first use
+_DECODER_TABLE: Optional[List[Optional['Decoder']]] = None
+
+
+def _build_table() -> List[Optional['Decoder']]:
+    """
+    Build the 256-entry opcode jump table.
+    
+    Decoders are stateless (string decoders fall back to looking up their
+    field list), so a single instance per opcode is shared by all journals.
+    
+    Returns:
+        List mapping each opcode byte to its decoder, or None
+    """
+    # Import here to avoid circular imports
+    from . import decoder as dec
+    
+    table: List[Optional['Decoder']] = [None] * 256
+    table[Opcode.HEADER] = dec.HeaderDecoder()
+    table[Opcode.SPLUNK_PRIVATE] = dec.SplunkPrivateDecoder()
+    for string_opcode in (Opcode.NEW_HOST, Opcode.NEW_SOURCE, Opcode.NEW_SOURCE_TYPE, Opcode.NEW_STRING):
+        table[string_opcode] = dec.StringFieldDecoder(string_opcode)
+    
+    # State change opcodes (17-31) and event opcodes (1, 2, 32-43) are not
+    # all in the enum but share one decoder each
+    state_decoder = dec.StateChangeDecoder()
+    for state_opcode in range(17, 32):
+        table[state_opcode] = state_decoder
+    event_decoder = dec.EventDecoder()
+    for event_opcode in (Opcode.OLDSTYLE_EVENT, Opcode.OLDSTYLE_EVENT_WITH_HASH, *range(32, 44)):
+        table[event_opcode] = event_decoder
+    
+    return table
+
+
+def get_decoder_table() -> List[Optional['Decoder']]:
+    """
+    Get the opcode jump table.
+    
+    Returns:
+        List mapping each opcode byte to its decoder, or None (NOP and
+        unknown opcodes)
+    """
+    global _DECODER_TABLE
+    if _DECODER_TABLE is None:
+        _DECODER_TABLE = _build_table()
+    return _DECODER_TABLE
+
+
 def get_decoder(opcode: Opcode) -> Optional['Decoder']:
     """
     Get the decoder for a specific opcode.
@@ -50,19 +99,4 @@ def get_decoder(opcode: Opcode) -> Optional['Decoder']:
     Returns:
         Decoder instance or None if no specific decoder exists
     """
-    # Import here to avoid circular imports
-    from . import decoder as dec
-    
-    decoders = {
-        Opcode.HEADER: dec.HeaderDecoder(),
-        Opcode.SPLUNK_PRIVATE: dec.SplunkPrivateDecoder(),
-        Opcode.NEW_HOST: dec.StringFieldDecoder(Opcode.NEW_HOST),
-        Opcode.NEW_SOURCE: dec.StringFieldDecoder(Opcode.NEW_SOURCE),
-        Opcode.NEW_SOURCE_TYPE: dec.StringFieldDecoder(Opcode.NEW_SOURCE_TYPE),
-        Opcode.NEW_STRING: dec.StringFieldDecoder(Opcode.NEW_STRING),
-        Opcode.OLDSTYLE_EVENT: dec.EventDecoder(),
-        Opcode.OLDSTYLE_EVENT_WITH_HASH: dec.EventDecoder(),
-        Opcode.NOP: None,
-    }
-    
-    return decoders.get(opcode)
+    return get_decoder_table()[opcode]
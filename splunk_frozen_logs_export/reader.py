@@ -3,7 +3,12 @@ Buffered reader with position tracking for journal parsing.
 """
 
 import io
-from typing import Optional
+from typing import BinaryIO
+
+
+# Default size of the reader's refill buffer, large enough to span several
+# zstd blocks per refill
+RING_SIZE = 1 << 18
 
 
 class CountedReader:
@@ -12,30 +17,121 @@ class CountedReader:
     
     This is essential for calculating message lengths in the journal format,
     where lengths are specified relative to the current position.
+    
+    The reader owns a bytearray buffer, refilled in place with readinto(),
+    and exposes it to decoders as a memoryview cursor: after ensure(n),
+    ``mv[off:off + n]`` holds the next n bytes of the stream (unless EOF)
+    and decoders parse in place and advance by assigning ``off``. A refill
+    moves the unread tail to the front of the buffer, so views into ``mv``
+    are only valid until the next ensure() that has to refill.
     """
     
-    def __init__(self, reader: io.BufferedReader, buffer_size: int = 8 * 4096):
+    def __init__(self, reader: BinaryIO, buffer_size: int = RING_SIZE):
         """
         Initialize a CountedReader.
         
         Args:
-            reader: The underlying buffered reader
-            buffer_size: Size of the read buffer (default: 32KB)
+            reader: The underlying stream (any object with a readinto()
+                method, e.g. a file, BytesIO or zstd stream reader)
+            buffer_size: Size of the read buffer (default: 256KB); it grows
+                when a single read needs more
+        """
+        self._readinto = reader.readinto
+        self._buf = bytearray(buffer_size)
+        self._eof = False
+        # Stream position of mv[0]
+        self._base = 0
+        self.mv = memoryview(self._buf)[:0]
+        self.off = 0
+    
+    @classmethod
+    def from_buffer(cls, data) -> 'CountedReader':
+        """
+        Create a reader over data that is already fully in memory.
+        
+        The whole buffer becomes mv, so nothing is ever copied or refilled
+        and views returned by view() slice the buffer directly (and stay
+        valid for as long as the buffer does).
+        
+        Args:
+            data: Any buffer-protocol object (bytes, bytearray, mmap)
+            
+        Returns:
+            CountedReader positioned at the start of data
+        """
+        reader = cls(io.BytesIO(), 0)
+        reader.mv = memoryview(data)
+        reader._eof = True
+        return reader
+    
+    @property
+    def pos(self) -> int:
+        """Current position in the stream."""
+        return self._base + self.off
+    
+    def ensure(self, n: int) -> int:
+        """
+        Make at least n bytes available at mv[off] unless EOF is reached.
+        
+        Args:
+            n: Number of bytes needed
+            
+        Returns:
+            Number of bytes available at mv[off] (less than n only at EOF)
         """
-        self.pos = 0
-        self._reader = reader
+        available = len(self.mv) - self.off
+        if available >= n or self._eof:
+            return available
+        return self._fill(n)
+    
+    def _fill(self, n: int) -> int:
+        """Move the unread tail to the front of the buffer and refill it."""
+        off = self.off
+        end = len(self.mv)
+        available = end - off
+        
+        buf = self._buf
+        if off:
+            buf[:available] = buf[off:end]
+        
+        self._base += off
+        self.off = 0
         
-    def peek(self, n: int) -> bytes:
+        readinto = self._readinto
+        full = memoryview(buf)
+        while available < n:
+            if available == len(buf):
+                # The read does not fit: grow into a new buffer (earlier views
+                # keep the old one alive). Lengths come from the stream, so
+                # grow as data actually arrives instead of straight to n
+                grown = bytearray(min(n, max(2 * len(buf), RING_SIZE)))
+                grown[:available] = full[:available]
+                buf = self._buf = grown
+                full = memoryview(buf)
+            got = readinto(full[available:])
+            if not got:
+                self._eof = True
+                break
+            available += got
+        
+        self.mv = full[:available]
+        return available
+    
+    def peek(self, n: int) -> memoryview:
         """
         Peek at the next n bytes without consuming them.
         
+        The bytes are borrowed from the reader's buffer rather than copied,
+        so the view is only valid until the reader next refills.
+        
         Args:
             n: Number of bytes to peek
             
         Returns:
-            Bytes peeked (may be less than n if EOF)
+            Memoryview over the bytes peeked (may be less than n if EOF)
         """
-        return self._reader.peek(n)[:n]
+        self.ensure(n)
+        return self.mv[self.off:self.off + n]
     
     def discard(self, n: int) -> int:
         """
@@ -47,8 +143,20 @@ class CountedReader:
         Returns:
             Number of bytes actually discarded
         """
-        discarded = len(self._reader.read(n))
-        self.pos += discarded
+        available = len(self.mv) - self.off
+        if n <= available:
+            self.off += n
+            return n
+        
+        # Skip through the stream a buffer at a time
+        discarded = 0
+        while discarded < n:
+            available = self.ensure(min(n - discarded, max(len(self._buf), 1)))
+            if not available:
+                break
+            skip = min(available, n - discarded)
+            self.off += skip
+            discarded += skip
         return discarded
     
     def read_byte(self) -> int:
@@ -61,11 +169,11 @@ class CountedReader:
         Raises:
             EOFError: If at end of file
         """
-        b = self._reader.read(1)
-        if not b:
+        if self.off >= len(self.mv) and not self.ensure(1):
             raise EOFError("Unexpected end of file")
-        self.pos += 1
-        return b[0]
+        off = self.off
+        self.off = off + 1
+        return self.mv[off]
     
     def read(self, n: int) -> bytes:
         """
@@ -78,10 +186,33 @@ class CountedReader:
             Bytes read
             
         Raises:
+            ValueError: If n is negative
+            EOFError: If unable to read n bytes
+        """
+        return self.view(n).tobytes()
+    
+    def view(self, n: int) -> memoryview:
+        """
+        Read exactly n bytes and return them as a memoryview.
+        
+        The view points straight into the reader's buffer, so no copy is
+        made; it is only valid until the reader next refills.
+        
+        Args:
+            n: Number of bytes to read
+            
+        Returns:
+            Memoryview over the bytes read
+            
+        Raises:
+            ValueError: If n is negative
             EOFError: If unable to read n bytes
         """
-        data = self._reader.read(n)
-        if len(data) != n:
-            raise EOFError(f"Expected {n} bytes, got {len(data)}")
-        self.pos += n
-        return data
+        if n < 0:
+            raise ValueError(f"Cannot read a negative number of bytes ({n})")
+        available = self.ensure(n)
+        if available < n:
+            raise EOFError(f"Expected {n} bytes, got {available}")
+        off = self.off
+        self.off = off + n
+        return self.mv[off:off + n]
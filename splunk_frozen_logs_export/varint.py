@@ -4,10 +4,14 @@ Optimized varint decoder for Splunk journal files.
 Based on: https://www.dolthub.com/blog/2021-01-08-optimizing-varint-decoding/
 """
 
-from typing import Tuple
+from typing import List, Tuple, Union
 
 
-def decode_uvarint(buf: bytes) -> Tuple[int, int]:
+# Anything indexable as bytes: bytes, bytearray or a memoryview over them
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def decode_uvarint(buf: Buffer) -> Tuple[int, int]:
     """
     Decode an unsigned varint from a byte buffer.
     
@@ -91,7 +95,7 @@ def decode_uvarint(buf: bytes) -> Tuple[int, int]:
     return 0, -10
 
 
-def decode_varint(buf: bytes) -> Tuple[int, int]:
+def decode_varint(buf: Buffer) -> Tuple[int, int]:
     """
     Decode a signed varint (zigzag encoded) from a byte buffer.
     
@@ -102,7 +106,159 @@ def decode_varint(buf: bytes) -> Tuple[int, int]:
         Tuple of (decoded_value, bytes_consumed)
     """
     ux, n = decode_uvarint(buf)
-    x = ux >> 1
-    if ux & 1:
-        x = ~x
-    return x, n
+    # Branch-free zigzag: flips all bits when the low (sign) bit is set
+    return (ux >> 1) ^ -(ux & 1), n
+
+
+# A branch-free SWAR decode (one int.from_bytes over the 8-byte window, then
+# mask-and-shift compaction of the 7-bit groups) measured slower than this
+# ladder for every varint length in CPython: building the window int costs
+# more than the per-byte branches it saves, even for 8-byte values.
+def decode_uvarint_at(buf: Buffer, off: int) -> Tuple[int, int]:
+    """
+    Decode an unsigned varint starting at buf[off].
+    
+    Same unrolled ladder as decode_uvarint, but indexing from an offset so
+    callers parsing a larger buffer need no slice per varint.
+    
+    Args:
+        buf: Byte buffer (or memoryview) containing the varint
+        off: Position of the varint in buf
+        
+    Returns:
+        Tuple of (decoded_value, bytes_consumed)
+        Returns (0, -N) on error where N is the number of bytes read
+    """
+    end = len(buf) - off
+    if end < 1:
+        return 0, -1
+    
+    b = buf[off]
+    if b < 0x80:
+        return b, 1
+    
+    if end < 2:
+        return 0, -2
+    x = b & 0x7f
+    b = buf[off + 1]
+    if b < 0x80:
+        return x | (b << 7), 2
+    
+    if end < 3:
+        return 0, -3
+    x |= (b & 0x7f) << 7
+    b = buf[off + 2]
+    if b < 0x80:
+        return x | (b << 14), 3
+    
+    if end < 4:
+        return 0, -4
+    x |= (b & 0x7f) << 14
+    b = buf[off + 3]
+    if b < 0x80:
+        return x | (b << 21), 4
+    
+    if end < 5:
+        return 0, -5
+    x |= (b & 0x7f) << 21
+    b = buf[off + 4]
+    if b < 0x80:
+        return x | (b << 28), 5
+    
+    if end < 6:
+        return 0, -6
+    x |= (b & 0x7f) << 28
+    b = buf[off + 5]
+    if b < 0x80:
+        return x | (b << 35), 6
+    
+    if end < 7:
+        return 0, -7
+    x |= (b & 0x7f) << 35
+    b = buf[off + 6]
+    if b < 0x80:
+        return x | (b << 42), 7
+    
+    if end < 8:
+        return 0, -8
+    x |= (b & 0x7f) << 42
+    b = buf[off + 7]
+    if b < 0x80:
+        return x | (b << 49), 8
+    
+    if end < 9:
+        return 0, -9
+    x |= (b & 0x7f) << 49
+    b = buf[off + 8]
+    if b < 0x80:
+        return x | (b << 56), 9
+    
+    if end < 10:
+        return 0, -10
+    x |= (b & 0x7f) << 56
+    b = buf[off + 9]
+    if b < 0x80:
+        return x | (b << 63), 10
+    
+    return 0, -10
+
+
+def decode_varint_at(buf: Buffer, off: int) -> Tuple[int, int]:
+    """
+    Decode a signed varint (zigzag encoded) starting at buf[off].
+    
+    Args:
+        buf: Byte buffer (or memoryview) containing the varint
+        off: Position of the varint in buf
+        
+    Returns:
+        Tuple of (decoded_value, bytes_consumed)
+    """
+    ux, n = decode_uvarint_at(buf, off)
+    # Branch-free zigzag: flips all bits when the low (sign) bit is set
+    return (ux >> 1) ^ -(ux & 1), n
+
+
+def decode_uvarints(buf: Buffer, offset: int, count: int) -> Tuple[List[int], int]:
+    """
+    Decode a run of consecutive unsigned varints from a byte buffer.
+    
+    Decoding the whole run in one call avoids a Python function call and a
+    buffer slice per value, which dominates when several varints follow each
+    other (e.g. the event header).
+    
+    Args:
+        buf: Byte buffer containing the varints
+        offset: Position of the first varint in buf
+        count: Number of varints to decode
+        
+    Returns:
+        Tuple of (decoded_values, end_offset)
+        Returns (partial_values, -1) on error
+    """
+    values = []
+    end = len(buf)
+    pos = offset
+    for _ in range(count):
+        if pos >= end:
+            return values, -1
+        b = buf[pos]
+        pos += 1
+        if b < 0x80:
+            values.append(b)
+            continue
+        
+        x = b & 0x7f
+        shift = 7
+        while True:
+            if pos >= end or shift > 63:
+                return values, -1
+            b = buf[pos]
+            pos += 1
+            x |= (b & 0x7f) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        values.append(x)
+    
+    return values, pos